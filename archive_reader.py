@@ -0,0 +1,102 @@
+"""
+Access to media files stored inside ZIP/TAR archives (e.g. Google Takeout).
+
+Archive members are addressed with plain strings of the form
+"<archive path>!/<member name>", so they can be passed around, filtered
+and sharded exactly like regular file paths.
+"""
+
+import os
+import tarfile
+import zipfile
+from datetime import datetime
+
+import config
+
+
+class ArchiveReader:
+    """Lists and opens media files inside archives."""
+    
+    @staticmethod
+    def is_archive(filepath):
+        """Return True if the path has a supported archive extension."""
+        lower = filepath.lower()
+        return any(lower.endswith(ext) for ext in config.ARCHIVE_EXTENSIONS)
+    
+    @staticmethod
+    def archive_extension(filepath):
+        """Return the archive extension of a path (e.g. '.tar.gz'), or None."""
+        lower = filepath.lower()
+        for ext in sorted(config.ARCHIVE_EXTENSIONS, key=len, reverse=True):
+            if lower.endswith(ext):
+                return ext
+        return None
+    
+    @staticmethod
+    def is_zip(archive_path):
+        """Return True for ZIP archives (random access), False for TAR."""
+        return archive_path.lower().endswith('.zip')
+    
+    @staticmethod
+    def member_path(archive_path, member_name):
+        """Build the source path string for an archive member."""
+        return f"{archive_path}{config.ARCHIVE_MEMBER_SEPARATOR}{member_name}"
+    
+    @staticmethod
+    def split_member_path(source_path):
+        """
+        Split a member path into (archive_path, member_name).
+        Returns (None, source_path) for regular files.
+        """
+        lower = source_path.lower()
+        for ext in config.ARCHIVE_EXTENSIONS:
+            index = lower.find(ext + config.ARCHIVE_MEMBER_SEPARATOR)
+            if index != -1:
+                split_at = index + len(ext)
+                member_start = split_at + len(config.ARCHIVE_MEMBER_SEPARATOR)
+                return source_path[:split_at], source_path[member_start:]
+                
+        return None, source_path
+    
+    @staticmethod
+    def list_members(archive_path):
+        """
+        Yield (name, open_member) for the regular files in a ZIP archive,
+        reading only its central directory. open_member() returns a stream
+        of the member and is only valid until the next member is yielded.
+        
+        TAR archives have no index; read them with iter_tar_members.
+        """
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir():
+                    yield info.filename, lambda info=info: zf.open(info)
+    
+    @staticmethod
+    def iter_zip_members(zf, member_names):
+        """Yield (name, size, mtime) for the given members of an open ZipFile."""
+        for name in member_names:
+            info = zf.getinfo(name)
+            yield name, info.file_size, datetime(*info.date_time)
+    
+    @staticmethod
+    def iter_tar_members(archive_path, member_names=None):
+        """
+        Yield (name, size, mtime, stream) for the given members (all regular
+        files if member_names is None) in one sequential pass over a TAR
+        archive.
+        
+        Each stream is only valid until the next member is requested.
+        """
+        wanted = set(member_names) if member_names is not None else None
+        with tarfile.open(archive_path, 'r|*') as tf:
+            for member in tf:
+                if wanted is not None and not wanted:
+                    break
+                if not member.isfile() or (wanted is not None and member.name not in wanted):
+                    continue
+                    
+                if wanted is not None:
+                    wanted.discard(member.name)
+                yield (member.name, member.size,
+                       datetime.fromtimestamp(member.mtime), tf.extractfile(member))
@@ -13,6 +13,37 @@ SUPPORTED_EXTENSIONS = {
         '.webm', '.mts', '.m2ts', '.ogv', '.asf', '.vob', '.dat', '.f4v'
     ]
 }
+
+# Archives whose members are organized directly, without extracting first
+ARCHIVE_EXTENSIONS = ['.zip', '.tar', '.tgz', '.tar.gz', '.tbz2', '.tar.bz2', '.txz', '.tar.xz']
+
+# Separator between an archive path and a member name ("dump.zip!/DCIM/a.jpg")
+ARCHIVE_MEMBER_SEPARATOR = '!/'
+
+# Bytes read from the start of an archive member to find its date
+ARCHIVE_HEADER_BYTES = 256 * 1024
+
+# Threads used to read members of one ZIP archive in parallel
+ARCHIVE_WORKERS = 8
+
+# Metadata sidecars indexed during the scan (Google Takeout, Lightroom/darktable)
+SIDECAR_EXTENSIONS = ['.json', '.xmp']
+
+# GUI engine process: seconds between batched progress messages, GUI poll
+# interval in milliseconds, and seconds to wait for a stop before terminating
+ENGINE_BATCH_INTERVAL = 0.1
+ENGINE_POLL_INTERVAL_MS = 50
+ENGINE_STOP_TIMEOUT = 5
+
+# Copies go to a hidden temporary file ending in PARTIAL_SUFFIX and are then
+# renamed, so a killed copy never leaves a truncated file. Archive members
+# are streamed in COPY_CHUNK_SIZE chunks, checking for a stop between chunks
+COPY_CHUNK_SIZE = 1024 * 1024
+PARTIAL_SUFFIX = '.partial'
+
+# Seconds between progress/stop checks while shard workers run
+SHARD_POLL_INTERVAL = 0.2
+
 # Month names in different languages
 MONTH_NAMES = {
     'english': [
@@ -38,3 +69,6 @@ DEFAULT_SETTINGS = {
 # File operation constants
 MAX_FILENAME_LENGTH = 255
 DUPLICATE_SUFFIX_TEMPLATE = "_{}"
+
+# Max Hamming distance between 64-bit perceptual hashes of near-duplicates
+DUPLICATE_HASH_THRESHOLD = 6
@@ -0,0 +1,332 @@
+"""
+Near-duplicate photo detection using perceptual hashes.
+
+Resized or recompressed copies of a photo (e.g. from messaging apps) have
+different bytes but nearly identical perceptual hashes. Hashes are computed
+in a process pool, packed into a NumPy uint64 array and matched with
+multi-index hashing, so the cost grows with the number of matches rather
+than with the square of the number of images.
+
+Requires numpy (pip install numpy).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import config
+
+HASH_BITS = 64
+# Chunks are kept small enough for a dense per-chunk bucket table
+MIN_CHUNK_BITS = 8
+MAX_CHUNK_BITS = 22
+# Buckets larger than this are matched recursively instead of expanded
+OVERSIZED_BUCKET = 1024
+# Most candidate pairs expanded and verified at once
+EXPAND_BLOCK = 1 << 22
+
+
+def _require_numpy():
+    """Import numpy, with a helpful message if it is missing."""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "Near-duplicate detection requires numpy. "
+            "Please install it using: pip install numpy"
+        )
+    return numpy
+
+
+def _hash_image(filepath, method):
+    """
+    Worker entry point: return (hash, pixel_count, size) for one image,
+    or None if it can't be decoded.
+    """
+    from PIL import Image
+    
+    try:
+        with Image.open(filepath) as img:
+            pixel_count = img.width * img.height
+            # Let JPEG decode at reduced scale; only a tiny thumbnail is needed
+            img.draft('L', (64, 64))
+            gray = img.convert('L')
+            
+            if method == 'phash':
+                image_hash = DuplicateFinder.phash(gray)
+            else:
+                image_hash = DuplicateFinder.dhash(gray)
+        
+        return image_hash, pixel_count, os.path.getsize(filepath)
+    except Exception:
+        return None
+
+
+class DuplicateFinder:
+    """Finds groups of visually identical images."""
+    
+    @staticmethod
+    def dhash(gray_image):
+        """64-bit difference hash: sign of horizontal gradients on a 9x8 thumbnail."""
+        np = _require_numpy()
+        from PIL import Image
+        
+        pixels = np.asarray(gray_image.resize((9, 8), Image.LANCZOS), dtype=np.int16)
+        bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+        return int(np.packbits(bits).view('>u8')[0])
+    
+    @staticmethod
+    def phash(gray_image):
+        """64-bit DCT hash: low frequencies of a 32x32 thumbnail against their median."""
+        np = _require_numpy()
+        from PIL import Image
+        
+        pixels = np.asarray(gray_image.resize((32, 32), Image.LANCZOS), dtype=np.float64)
+        n = np.arange(32)
+        dct_matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / 64)
+        low = (dct_matrix @ pixels @ dct_matrix.T)[:8, :8].ravel()
+        bits = low > np.median(low[1:])
+        return int(np.packbits(bits).view('>u8')[0])
+    
+    @staticmethod
+    def compute_hashes(filepaths, method='dhash', workers=None, stop_check=None):
+        """
+        Hash images in a process pool.
+        
+        Returns (paths, hashes, pixel_counts, sizes) for the images that could
+        be decoded; hashes is a packed uint64 NumPy array. Archive members are
+        skipped.
+        """
+        np = _require_numpy()
+        from archive_reader import ArchiveReader
+        
+        image_exts = set(config.SUPPORTED_EXTENSIONS['images'])
+        candidates = [
+            f for f in filepaths
+            if os.path.splitext(f)[1].lower() in image_exts
+            and ArchiveReader.split_member_path(f)[0] is None
+        ]
+        
+        paths, hashes, pixel_counts, sizes = [], [], [], []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_hash_image, candidates,
+                                   [method] * len(candidates), chunksize=64)
+            for filepath, result in zip(candidates, results):
+                if stop_check and stop_check():
+                    executor.shutdown(cancel_futures=True)
+                    break
+                if result is None:
+                    continue
+                paths.append(filepath)
+                hashes.append(result[0])
+                pixel_counts.append(result[1])
+                sizes.append(result[2])
+        
+        return (paths, np.array(hashes, dtype=np.uint64),
+                np.array(pixel_counts, dtype=np.int64), np.array(sizes, dtype=np.int64))
+    
+    @staticmethod
+    def find_pairs(hashes, threshold=config.DUPLICATE_HASH_THRESHOLD):
+        """
+        Return index arrays (i, j), i < j, of hashes within the Hamming threshold.
+        
+        Multi-index hashing: the 64 bits are split into m chunks of about
+        log2(n) bits. Two hashes within distance t differ by at most t // m
+        bits on at least one chunk, so for every chunk only values that close
+        are probed, through a bucket table indexed by chunk value. Candidates
+        are expanded and verified in blocks of at most EXPAND_BLOCK pairs.
+        Buckets holding more than OVERSIZED_BUCKET hashes (many hashes that
+        agree on a whole chunk) are matched recursively on the remaining
+        bits instead, so skewed input can't blow up the candidate count.
+        """
+        np = _require_numpy()
+        
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        i, j = DuplicateFinder._match_pairs(hashes, hashes, threshold, HASH_BITS, True)
+        if not len(i):
+            return i, j
+        
+        # A pair close on several chunks is found more than once
+        pairs = np.unique(i * len(hashes) + j)
+        return pairs // len(hashes), pairs % len(hashes)
+    
+    @staticmethod
+    def _match_pairs(a, b, threshold, hash_bits, same):
+        """
+        Return index arrays (i into a, j into b) of hashes within the
+        threshold, looking only at the low hash_bits bits. With same (a is
+        b), only pairs with i < j are returned. Pairs may be repeated.
+        """
+        np = _require_numpy()
+        
+        empty = np.empty(0, dtype=np.int64)
+        if not len(a) or not len(b):
+            return empty, empty
+        if hash_bits <= threshold:
+            # Nothing left to tell the hashes apart: every pair matches
+            if same:
+                i, j = np.triu_indices(len(a), 1)
+            else:
+                i, j = np.meshgrid(np.arange(len(a)), np.arange(len(b)), indexing='ij')
+            return i.ravel().astype(np.int64), j.ravel().astype(np.int64)
+        
+        count = max(len(a), len(b))
+        chunk_bits = min(max(count.bit_length(), MIN_CHUNK_BITS), MAX_CHUNK_BITS, hash_bits)
+        chunk_count = max(hash_bits // chunk_bits, -(-hash_bits // MAX_CHUNK_BITS))
+        radius = threshold // chunk_count
+        bounds = [hash_bits * k // chunk_count for k in range(chunk_count + 1)]
+        
+        def bucket_table(values, width):
+            order = np.argsort(values, kind='stable')
+            sizes = np.bincount(values, minlength=1 << width)
+            return order, sizes, np.cumsum(sizes) - sizes
+        
+        found_i, found_j = [], []
+        for low, high in zip(bounds[:-1], bounds[1:]):
+            width = high - low
+            chunk_mask = np.uint64((1 << width) - 1)
+            chunk_a = ((a >> np.uint64(low)) & chunk_mask).astype(np.int64)
+            order_a, sizes_a, starts_a = bucket_table(chunk_a, width)
+            if same:
+                chunk_b, order_b, sizes_b, starts_b = chunk_a, order_a, sizes_a, starts_a
+            else:
+                chunk_b = ((b >> np.uint64(low)) & chunk_mask).astype(np.int64)
+                order_b, sizes_b, starts_b = bucket_table(chunk_b, width)
+            oversized_a = sizes_a > OVERSIZED_BUCKET
+            oversized_b = sizes_b > OVERSIZED_BUCKET
+            
+            # Hashes with this chunk removed, for matching oversized buckets
+            rest_a = rest_b = None
+            if oversized_a.any() or oversized_b.any():
+                low_bits = np.uint64((1 << low) - 1)
+                
+                def remove_chunk(values):
+                    rest = values & low_bits
+                    if high < HASH_BITS:
+                        rest |= (values >> np.uint64(high)) << np.uint64(low)
+                    return rest
+                
+                rest_a = remove_chunk(a)
+                rest_b = rest_a if same else remove_chunk(b)
+            
+            for flips in range(radius + 1):
+                for bits in combinations(range(width), flips):
+                    mask = sum(1 << bit for bit in bits)
+                    probe = chunk_a ^ mask
+                    
+                    # Regular buckets: expand each row's probe bucket in blocks
+                    matches = np.where(oversized_a[chunk_a] | oversized_b[probe], 0, sizes_b[probe])
+                    rows = np.flatnonzero(matches)
+                    if len(rows):
+                        matches = matches[rows]
+                        ends = np.cumsum(matches)
+                        block_start = 0
+                        while block_start < len(rows):
+                            limit = (ends[block_start - 1] if block_start else 0) + EXPAND_BLOCK
+                            block_end = max(int(np.searchsorted(ends, limit, side='right')), block_start + 1)
+                            block_rows = rows[block_start:block_end]
+                            block_matches = matches[block_start:block_end]
+                            total = int(block_matches.sum())
+                            
+                            i = np.repeat(block_rows, block_matches)
+                            offsets = np.arange(total) - np.repeat(np.cumsum(block_matches) - block_matches,
+                                                                   block_matches)
+                            j = order_b[np.repeat(starts_b[probe[block_rows]], block_matches) + offsets]
+                            
+                            if same:
+                                keep = i < j
+                                i, j = i[keep], j[keep]
+                            close = DuplicateFinder.hamming(a[i], b[j]) <= threshold
+                            found_i.append(i[close])
+                            found_j.append(j[close])
+                            block_start = block_end
+                    
+                    # Oversized buckets: match their members on the remaining bits
+                    big_a = np.flatnonzero(oversized_a)
+                    big_b = np.flatnonzero(oversized_b)
+                    bucket_pairs = set(zip(big_a.tolist(), (big_a ^ mask).tolist()))
+                    bucket_pairs.update(zip((big_b ^ mask).tolist(), big_b.tolist()))
+                    for value_a, value_b in bucket_pairs:
+                        if not sizes_a[value_a] or not sizes_b[value_b]:
+                            continue
+                        if same and value_a > value_b:
+                            continue  # the same pair of buckets seen from the other side
+                        members_a = order_a[starts_a[value_a]:starts_a[value_a] + sizes_a[value_a]]
+                        members_b = order_b[starts_b[value_b]:starts_b[value_b] + sizes_b[value_b]]
+                        sub_i, sub_j = DuplicateFinder._match_pairs(
+                            rest_a[members_a], rest_b[members_b], threshold - flips,
+                            hash_bits - width, same and value_a == value_b
+                        )
+                        i, j = members_a[sub_i], members_b[sub_j]
+                        if same:
+                            i, j = np.minimum(i, j), np.maximum(i, j)
+                        found_i.append(i)
+                        found_j.append(j)
+        
+        if not found_i:
+            return empty, empty
+        return np.concatenate(found_i), np.concatenate(found_j)
+    
+    @staticmethod
+    def hamming(a, b):
+        """Element-wise Hamming distance between two uint64 arrays."""
+        np = _require_numpy()
+        
+        xor = np.bitwise_xor(a, b)
+        if hasattr(np, 'bitwise_count'):
+            return np.bitwise_count(xor)
+        table = np.array([bin(v).count('1') for v in range(256)], dtype=np.uint8)
+        return table[xor.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+    
+    @staticmethod
+    def find_groups(filepaths, threshold=config.DUPLICATE_HASH_THRESHOLD,
+                    method='dhash', workers=None, stop_check=None):
+        """
+        Group visually identical images.
+        
+        Returns a list of groups (lists of paths, at least two each). The
+        first path of each group is the one to keep: the largest image, then
+        the largest file.
+        """
+        np = _require_numpy()
+        
+        paths, hashes, pixel_counts, sizes = DuplicateFinder.compute_hashes(
+            filepaths, method, workers, stop_check
+        )
+        if not paths:
+            return []
+        
+        # Exact hash matches are grouped for free; only distinct values are
+        # compared, so thousands of identical hashes don't create n^2 pairs
+        unique_hashes, inverse = np.unique(hashes, return_inverse=True)
+        parent = list(range(len(unique_hashes)))
+        
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+        
+        for a, b in zip(*DuplicateFinder.find_pairs(unique_hashes, threshold)):
+            root_a, root_b = find(int(a)), find(int(b))
+            if root_a != root_b:
+                parent[root_b] = root_a
+        
+        members = {}
+        for index, unique_index in enumerate(inverse.ravel()):
+            members.setdefault(find(int(unique_index)), []).append(index)
+        
+        groups = []
+        for indices in members.values():
+            if len(indices) < 2:
+                continue
+            indices.sort(key=lambda k: (-pixel_counts[k], -sizes[k], paths[k]))
+            groups.append([paths[k] for k in indices])
+        
+        groups.sort(key=lambda group: group[0])
+        return groups
+    
+    @staticmethod
+    def duplicate_map(groups):
+        """Map every non-kept path of each group to the path that is kept."""
+        return {path: group[0] for group in groups for path in group[1:]}
@@ -0,0 +1,153 @@
+"""
+Hosts the FileProcessor engine in a child process for the GUI.
+
+Running the engine out of process keeps EXIF parsing and copying off the
+Tk interpreter's GIL, and a crash while decoding a corrupt file only takes
+down the child. Progress and errors travel back over a pipe in batches,
+at most one message per config.ENGINE_BATCH_INTERVAL.
+"""
+
+import multiprocessing
+import threading
+import time
+import traceback
+
+import config
+
+
+class _EngineReporter:
+    """Child side: collects callbacks and sends them to the GUI in batches."""
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.progress = None
+        self.errors = []
+        self.last_send = 0
+    
+    def on_progress(self, index, source_file):
+        """progress_callback: remember the latest file and flush if due."""
+        with self.lock:
+            self.progress = (index, source_file)
+            if time.monotonic() - self.last_send >= config.ENGINE_BATCH_INTERVAL:
+                self._flush()
+    
+    def on_error(self, error_msg):
+        """error_callback: queue the error for the next batch."""
+        with self.lock:
+            self.errors.append(error_msg)
+    
+    def flush(self):
+        """Send whatever is pending."""
+        with self.lock:
+            self._flush()
+    
+    def _flush(self):
+        if self.progress is None and not self.errors:
+            return
+        self.conn.send(('progress', self.progress, self.errors))
+        self.progress = None
+        self.errors = []
+        self.last_send = time.monotonic()
+
+
+def _run_engine(conn, cancel_event, source_files, options):
+    """Child process entry point: run organize_files and report back."""
+    from file_processor import FileProcessor
+    
+    reporter = _EngineReporter(conn)
+    processor = FileProcessor(
+        progress_callback=reporter.on_progress,
+        error_callback=reporter.on_error,
+        cancel_event=cancel_event
+    )
+    
+    try:
+        stats, errors = processor.organize_files(source_files, **options)
+        reporter.flush()
+        conn.send(('done', {year: dict(s) for year, s in stats.items()}, errors))
+    except Exception:
+        reporter.flush()
+        conn.send(('failed', traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+class EngineProcess:
+    """
+    GUI side handle for an engine running in a child process.
+    
+    Has the total_files, start_time and stop_processing() of FileProcessor,
+    so it can stand in for one in the GUI.
+    """
+    
+    def __init__(self):
+        self.total_files = 0
+        self.start_time = None
+        self.process = None
+        self.conn = None
+        self.cancel_event = None
+        self.stop_time = None
+        self.last_file = None
+    
+    def start(self, source_files, **options):
+        """Start organize_files(source_files, **options) in a child process."""
+        # spawn: never fork an interpreter that has Tk and threads running
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe(duplex=False)
+        self.cancel_event = context.Event()
+        
+        self.total_files = len(source_files)
+        self.start_time = time.time()
+        self.process = context.Process(
+            target=_run_engine,
+            args=(child_conn, self.cancel_event, source_files, options),
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+    
+    def poll(self):
+        """
+        Return the messages received since the last call, without blocking:
+            ('progress', (index, source_file) or None, [errors])
+            ('done', stats, errors)
+            ('failed', message)
+            ('stopped', message)
+        
+        A child that dies without reporting produces a 'failed' message. One
+        that ignores a stop request for longer than config.ENGINE_STOP_TIMEOUT
+        is terminated and produces a 'stopped' message; copies are published
+        by renaming finished temporary files, so no truncated files are left.
+        """
+        messages = []
+        try:
+            while self.conn.poll():
+                message = self.conn.recv()
+                if message[0] == 'progress' and message[1]:
+                    self.last_file = message[1][1]
+                messages.append(message)
+                if message[0] != 'progress':
+                    self.process.join()
+                    return messages
+        except (EOFError, OSError):
+            self.process.join()
+            detail = f" (last reported file: {self.last_file})" if self.last_file else ""
+            messages.append(('failed', f"Engine stopped unexpectedly "
+                                       f"(exit code {self.process.exitcode}){detail}"))
+            return messages
+        
+        if self.stop_time and time.time() - self.stop_time > config.ENGINE_STOP_TIMEOUT:
+            self.process.terminate()
+            self.process.join()
+            messages.append(('stopped', f"Engine did not stop within {config.ENGINE_STOP_TIMEOUT}s "
+                                        f"and was terminated; unfinished copies may remain as "
+                                        f"hidden {config.PARTIAL_SUFFIX} files"))
+        
+        return messages
+    
+    def stop_processing(self):
+        """Request to stop processing; the child stops before its next file."""
+        if self.cancel_event is not None and self.stop_time is None:
+            self.cancel_event.set()
+            self.stop_time = time.time()
@@ -0,0 +1,353 @@
+"""
+Lightweight EXIF date reading straight from image containers.
+
+Instead of having Pillow decode the image, the container is walked with a
+few small reads to find the raw EXIF (TIFF) block, which is then parsed by a
+single shared date parser. Supports JPEG, PNG (eXIf and ImageMagick's raw
+profile text chunks), WebP (RIFF EXIF chunk) and HEIC/HEIF (ISO-BMFF Exif
+item located through iinf/iloc), which Pillow can't open without a plugin.
+"""
+
+import binascii
+import struct
+import zlib
+from datetime import datetime
+
+# EXIF tags, in order of preference
+DATE_TAGS = (0x9003, 0x9004, 0x0132)  # DateTimeOriginal, DateTimeDigitized, DateTime
+EXIF_IFD_POINTER = 0x8769
+ASCII_TYPE = 2
+
+HEIF_BRANDS = {b'heic', b'heix', b'heim', b'heis', b'hevc', b'hevx', b'mif1', b'msf1', b'avif'}
+
+# Largest metadata block read in one go; EXIF segments are at most 64 KB
+MAX_BLOCK = 1024 * 1024
+
+
+class ExifFormatError(ValueError):
+    """Raised when a container is malformed and can't be walked."""
+
+
+class ExifReader:
+    """Finds and parses EXIF dates without decoding images."""
+    
+    @staticmethod
+    def read_date(source):
+        """
+        Return the EXIF date of an image, or None if it has no EXIF date.
+        
+        source is a path or a seekable binary file object. Raises
+        ExifFormatError for unsupported or malformed containers, so callers
+        can fall back to a full decoder.
+        """
+        if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+            with open(source, 'rb') as f:
+                return ExifReader.read_date(f)
+        
+        tiff = ExifReader.find_exif(source)
+        return ExifReader.parse_date(tiff) if tiff else None
+    
+    @staticmethod
+    def find_exif(f):
+        """Return the raw EXIF block of a JPEG/PNG/WebP/HEIF file object, or None."""
+        start = f.tell()
+        head = f.read(12)
+        f.seek(start)
+        
+        try:
+            if head[:2] == b'\xff\xd8':
+                return ExifReader._find_jpeg_exif(f)
+            if head[:8] == b'\x89PNG\r\n\x1a\n':
+                return ExifReader._find_png_exif(f)
+            if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+                return ExifReader._find_webp_exif(f)
+            if head[4:8] == b'ftyp' and head[8:12] in HEIF_BRANDS:
+                return ExifReader._find_heif_exif(f)
+        except (struct.error, zlib.error, binascii.Error, IndexError) as e:
+            raise ExifFormatError(str(e))
+        
+        raise ExifFormatError("Unsupported image container")
+    
+    @staticmethod
+    def parse_date(tiff):
+        """
+        Parse the capture date from a raw EXIF block (a TIFF structure,
+        optionally preceded by the "Exif\\0\\0" marker). Returns datetime or None.
+        """
+        if tiff.startswith(b'Exif\x00\x00'):
+            tiff = tiff[6:]
+        if tiff[:2] == b'II':
+            order = '<'
+        elif tiff[:2] == b'MM':
+            order = '>'
+        else:
+            return None
+        
+        try:
+            ifd0 = struct.unpack_from(order + 'I', tiff, 4)[0]
+            tags = ExifReader._read_ifd(tiff, order, ifd0)
+            if EXIF_IFD_POINTER in tags:
+                tags.update(ExifReader._read_ifd(tiff, order, tags[EXIF_IFD_POINTER]))
+        except struct.error:
+            return None
+        
+        for tag in DATE_TAGS:
+            value = tags.get(tag)
+            if isinstance(value, bytes):
+                date = ExifReader.parse_date_string(value.split(b'\x00')[0].decode('ascii', 'replace'))
+                if date:
+                    return date
+        
+        return None
+    
+    @staticmethod
+    def parse_date_string(date_str):
+        """Parse an EXIF date string ("YYYY:MM:DD HH:MM:SS"); None if invalid."""
+        try:
+            return datetime.strptime(date_str.strip(), '%Y:%m:%d %H:%M:%S')
+        except (ValueError, TypeError):
+            return None
+    
+    @staticmethod
+    def _read_ifd(tiff, order, offset):
+        """Return {tag: value} for the date tags and Exif pointer of one IFD."""
+        tags = {}
+        count = struct.unpack_from(order + 'H', tiff, offset)[0]
+        
+        for index in range(count):
+            entry = offset + 2 + index * 12
+            tag, field_type, length, value = struct.unpack_from(order + 'HHI4s', tiff, entry)
+            
+            if tag == EXIF_IFD_POINTER:
+                tags[tag] = struct.unpack(order + 'I', value)[0]
+            elif tag in DATE_TAGS and field_type == ASCII_TYPE:
+                if length <= 4:
+                    tags[tag] = value[:length]
+                else:
+                    value_offset = struct.unpack(order + 'I', value)[0]
+                    tags[tag] = tiff[value_offset:value_offset + length]
+        
+        return tags
+    
+    @staticmethod
+    def _read_exact(f, size):
+        """Read exactly size bytes or raise struct.error on a truncated file."""
+        if size > MAX_BLOCK:
+            raise struct.error("Metadata block too large")
+        data = f.read(size)
+        if len(data) < size:
+            raise struct.error("Unexpected end of file")
+        return data
+    
+    @staticmethod
+    def _find_jpeg_exif(f):
+        """Walk JPEG marker segments up to the image data, looking for APP1 Exif."""
+        f.seek(2, 1)
+        while True:
+            prefix, marker, length = struct.unpack('>BBH', ExifReader._read_exact(f, 4))
+            if prefix != 0xFF:
+                raise struct.error("Invalid JPEG marker")
+            if marker in (0xDA, 0xD9):  # Start of scan / end of image
+                return None
+            if marker == 0xE1:
+                data = ExifReader._read_exact(f, length - 2)
+                if data.startswith(b'Exif\x00\x00'):
+                    return data
+            else:
+                f.seek(length - 2, 1)
+    
+    @staticmethod
+    def _find_png_exif(f):
+        """Walk PNG chunks (skipping pixel data) for eXIf or a raw EXIF text profile."""
+        f.seek(8, 1)
+        while True:
+            length, chunk_type = struct.unpack('>I4s', ExifReader._read_exact(f, 8))
+            
+            if chunk_type == b'eXIf':
+                return ExifReader._read_exact(f, length)
+            if chunk_type in (b'tEXt', b'zTXt', b'iTXt') and length <= MAX_BLOCK:
+                exif = ExifReader._png_text_exif(chunk_type, ExifReader._read_exact(f, length))
+                if exif:
+                    return exif
+                f.seek(4, 1)
+                continue
+            if chunk_type == b'IEND':
+                return None
+            
+            f.seek(length + 4, 1)  # data + CRC
+    
+    @staticmethod
+    def _png_text_exif(chunk_type, data):
+        """Decode ImageMagick's "Raw profile type exif" text chunk, if this is one."""
+        keyword, _, text = data.partition(b'\x00')
+        if keyword.lower() not in (b'raw profile type exif', b'raw profile type app1'):
+            return None
+        
+        if chunk_type == b'zTXt':
+            text = zlib.decompress(text[1:])
+        elif chunk_type == b'iTXt':
+            compressed = text[0]
+            # Skip compression method, language tag and translated keyword
+            text = text[2:].split(b'\x00', 2)[2]
+            if compressed:
+                text = zlib.decompress(text)
+        
+        # Format: "\nexif\n      <length>\n<hex lines>"
+        parts = text.split(None, 2)
+        if len(parts) < 3:
+            return None
+        return binascii.unhexlify(b''.join(parts[2].split()))
+    
+    @staticmethod
+    def _find_webp_exif(f):
+        """Walk WebP RIFF chunks for the EXIF chunk."""
+        f.seek(12, 1)
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_type, length = struct.unpack('<4sI', header)
+            
+            if chunk_type == b'EXIF':
+                return ExifReader._read_exact(f, length)
+            
+            f.seek(length + (length & 1), 1)  # chunks are padded to even size
+    
+    @staticmethod
+    def _find_heif_exif(f):
+        """Find the Exif item of a HEIF file through its iinf and iloc boxes."""
+        start = f.tell()
+        
+        meta = None
+        for box_type, payload_start, payload_size in ExifReader._iter_boxes(f, start, None):
+            if box_type == b'meta':
+                # meta is a full box: skip version and flags
+                meta = (payload_start + 4, payload_size - 4)
+                break
+        if meta is None:
+            return None
+        
+        exif_item = None
+        locations = {}
+        for box_type, payload_start, payload_size in ExifReader._iter_boxes(f, *meta):
+            if box_type == b'iinf':
+                f.seek(payload_start)
+                exif_item = ExifReader._parse_iinf(ExifReader._read_exact(f, payload_size))
+            elif box_type == b'iloc':
+                f.seek(payload_start)
+                locations = ExifReader._parse_iloc(ExifReader._read_exact(f, payload_size))
+        
+        if exif_item is None or exif_item not in locations:
+            return None
+        
+        data = b''
+        for offset, length in locations[exif_item]:
+            f.seek(start + offset)
+            data += ExifReader._read_exact(f, length)
+        
+        # Item payload: 4-byte offset to the TIFF header, then the EXIF block
+        tiff_offset = struct.unpack_from('>I', data)[0]
+        return data[4 + tiff_offset:]
+    
+    @staticmethod
+    def _iter_boxes(f, offset, size):
+        """Yield (type, payload_offset, payload_size) for ISO-BMFF boxes in a range."""
+        end = offset + size if size is not None else None
+        while end is None or offset + 8 <= end:
+            f.seek(offset)
+            header = f.read(8)
+            if len(header) < 8:
+                return
+            box_size, box_type = struct.unpack('>I4s', header)
+            header_size = 8
+            
+            if box_size == 1:
+                box_size = struct.unpack('>Q', ExifReader._read_exact(f, 8))[0]
+                header_size = 16
+            elif box_size == 0:
+                if end is None:
+                    f.seek(0, 2)
+                    box_size = f.tell() - offset
+                else:
+                    box_size = end - offset
+            if box_size < header_size:
+                raise struct.error("Invalid box size")
+            
+            yield box_type, offset + header_size, box_size - header_size
+            offset += box_size
+    
+    @staticmethod
+    def _parse_iinf(data):
+        """Return the item ID of the 'Exif' item listed in an iinf box payload."""
+        version = data[0]
+        pos = 4
+        if version == 0:
+            entry_count = struct.unpack_from('>H', data, pos)[0]
+            pos += 2
+        else:
+            entry_count = struct.unpack_from('>I', data, pos)[0]
+            pos += 4
+        
+        for _ in range(entry_count):
+            box_size, box_type = struct.unpack_from('>I4s', data, pos)
+            if box_type == b'infe':
+                infe_version = data[pos + 8]
+                body = pos + 12
+                if infe_version >= 2:
+                    if infe_version == 2:
+                        item_id = struct.unpack_from('>H', data, body)[0]
+                        body += 2
+                    else:
+                        item_id = struct.unpack_from('>I', data, body)[0]
+                        body += 4
+                    item_type = data[body + 2:body + 6]  # after protection index
+                    if item_type == b'Exif':
+                        return item_id
+            if box_size < 8:
+                raise struct.error("Invalid infe size")
+            pos += box_size
+        
+        return None
+    
+    @staticmethod
+    def _parse_iloc(data):
+        """Return {item_id: [(file offset, length), ...]} from an iloc box payload."""
+        version = data[0]
+        offset_size = data[4] >> 4
+        length_size = data[4] & 0x0F
+        base_offset_size = data[5] >> 4
+        index_size = data[5] & 0x0F if version in (1, 2) else 0
+        pos = 6
+        
+        def read_uint(size):
+            nonlocal pos
+            if size == 0:
+                return 0
+            if pos + size > len(data):
+                raise struct.error("Truncated iloc box")
+            value = int.from_bytes(data[pos:pos + size], 'big')
+            pos += size
+            return value
+        
+        item_count = read_uint(2 if version < 2 else 4)
+        locations = {}
+        
+        for _ in range(item_count):
+            item_id = read_uint(2 if version < 2 else 4)
+            construction_method = read_uint(2) & 0x0F if version in (1, 2) else 0
+            read_uint(2)  # data_reference_index
+            base_offset = read_uint(base_offset_size)
+            extent_count = read_uint(2)
+            
+            extents = []
+            for _ in range(extent_count):
+                read_uint(index_size)
+                extent_offset = read_uint(offset_size)
+                extent_length = read_uint(length_size)
+                extents.append((base_offset + extent_offset, extent_length))
+            
+            # Only items stored at plain file offsets are supported
+            if construction_method == 0:
+                locations[item_id] = extents
+        
+        return locations
@@ -4,33 +4,114 @@ Core file processing and organization logic.
 
 import os
 import shutil
+import hashlib
+import tempfile
+import zipfile
+import multiprocessing
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import threading
 from queue import Queue
 import time
 
+import config
+from archive_reader import ArchiveReader
+from sidecar_index import SidecarIndex
+
+
+# Shared with the shard worker processes through the pool initializer
+_shard_cancel_event = None
+_shard_file_counter = None
+
+
+def _init_shard_worker(cancel_event, file_counter):
+    """Pool initializer: keep the parent's stop event and file counter."""
+    global _shard_cancel_event, _shard_file_counter
+    _shard_cancel_event = cancel_event
+    _shard_file_counter = file_counter
+
+
+def _organize_shard(shard_files, dest_folder, sort_level, use_month_names,
+                    month_language, dry_run, sidecar_index=None,
+                    duplicates=None, duplicate_action='skip', selected_extensions=None):
+    """Worker entry point: organize one shard in a fresh FileProcessor."""
+    def on_progress(index, source_file):
+        if _shard_file_counter is not None:
+            with _shard_file_counter.get_lock():
+                _shard_file_counter.value += 1
+                
+    processor = FileProcessor(progress_callback=on_progress, cancel_event=_shard_cancel_event)
+    stats, errors = processor.organize_files(
+        shard_files, dest_folder, sort_level,
+        use_month_names=use_month_names,
+        month_language=month_language,
+        dry_run=dry_run,
+        sidecar_index=sidecar_index,
+        duplicates=duplicates,
+        duplicate_action=duplicate_action,
+        selected_extensions=selected_extensions
+    )
+    # defaultdict with a lambda factory can't be pickled back to the parent
+    return {year: dict(year_stats) for year, year_stats in stats.items()}, errors
+
+
 class FileProcessor:
     """Handles file scanning, copying, and organization."""
     
-    def __init__(self, progress_callback=None, error_callback=None):
+    def __init__(self, progress_callback=None, error_callback=None, cancel_event=None):
         self.progress_callback = progress_callback
         self.error_callback = error_callback
+        # Optional multiprocessing Event for stop requests from another process
+        self.cancel_event = cancel_event
         self.stop_requested = False
         self.processed_files = 0
         self.total_files = 0
+        self.skipped_duplicates = 0
         self.start_time = None
+        self.sidecar_index = SidecarIndex()
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self._undated_members = []
+        self._member_extensions = None
+        
+    def scan_files(self, source_folder, selected_extensions, include_archives=True):
+        """
+        Recursively scan for files with selected extensions.
+        
+        With include_archives, members of ZIP archives found during the
+        walk are returned as "<archive>!/<member>" paths (listing a ZIP only
+        reads its central directory). TAR archives are returned as a single
+        source counted under their archive extension, so that organize_files
+        can read them in one sequential pass instead of decompressing them
+        once to list and again to copy.
         
-    def scan_files(self, source_folder, selected_extensions):
-        """Recursively scan for files with selected extensions."""
+        Sidecar files (.json, .xmp) seen during the same walk are collected
+        into self.sidecar_index for organize_files.
+        """
         all_files = []
         extension_counts = defaultdict(int)
+        self.sidecar_index = SidecarIndex()
         
         for root, _, files in os.walk(source_folder):
             for file in files:
-                if self.stop_requested:
+                if self._should_stop():
                     return [], {}
                     
+                if SidecarIndex.is_sidecar(file):
+                    self.sidecar_index.add(os.path.join(root, file))
+                    continue
+                    
+                if include_archives and ArchiveReader.is_archive(file):
+                    archive_path = os.path.join(root, file)
+                    if ArchiveReader.is_zip(archive_path):
+                        self._scan_archive(archive_path, selected_extensions,
+                                           all_files, extension_counts)
+                    else:
+                        all_files.append(archive_path)
+                        extension_counts[ArchiveReader.archive_extension(file)] += 1
+                    continue
+                    
                 ext = os.path.splitext(file)[1].lower()
                 if ext in selected_extensions:
                     filepath = os.path.join(root, file)
@@ -39,8 +120,185 @@ class FileProcessor:
                     
         return all_files, extension_counts
     
+    def _scan_archive(self, archive_path, selected_extensions, all_files, extension_counts):
+        """
+        Add the matching members of one ZIP archive to the scan results.
+        Errors are passed to error_callback; a bad member only skips itself.
+        """
+        try:
+            for member_name, open_member in ArchiveReader.list_members(archive_path):
+                if self._should_stop():
+                    return
+                    
+                member_path = ArchiveReader.member_path(archive_path, member_name)
+                if SidecarIndex.is_sidecar(member_name):
+                    # Sidecars are tiny; parse them now rather than reopening
+                    # the archive for each lookup later
+                    try:
+                        with open_member() as stream:
+                            date = SidecarIndex.parse_date(member_name, stream.read())
+                    except Exception as e:
+                        self._report_error(f"Error reading {member_path}: {str(e)}")
+                        continue
+                    if date:
+                        self.sidecar_index.add(member_path, date)
+                    continue
+                    
+                ext = os.path.splitext(member_name)[1].lower()
+                if ext in selected_extensions:
+                    all_files.append(member_path)
+                    extension_counts[ext] += 1
+        except Exception as e:
+            self._report_error(f"Error reading archive {archive_path}: {str(e)}")
+    
+    def _report_error(self, error_msg):
+        """Pass an error that isn't tied to a processing run to error_callback."""
+        if self.error_callback:
+            self.error_callback(error_msg)
+    
+    @staticmethod
+    def file_extension(filepath):
+        """
+        Return the extension scan_files counts a source under: the archive
+        extension for whole archives (e.g. '.tar.gz'), else the file's own.
+        """
+        if ArchiveReader.split_member_path(filepath)[0] is None:
+            archive_ext = ArchiveReader.archive_extension(filepath)
+            if archive_ext:
+                return archive_ext
+        return os.path.splitext(filepath)[1].lower()
+    
+    @staticmethod
+    def shard_for_path(filepath, shard_count, source_root=None):
+        """
+        Return the shard index (0..shard_count-1) that owns a file.
+        
+        The index comes from an MD5 of the path, so it is the same in every
+        process and on every machine. Pass source_root to hash the path
+        relative to it, for nodes that mount the source at different places.
+        Members of a TAR archive are sharded by the archive path, so the
+        archive is only decompressed by one shard.
+        """
+        archive_path = ArchiveReader.split_member_path(filepath)[0]
+        if archive_path and not ArchiveReader.is_zip(archive_path):
+            filepath = archive_path
+        if source_root:
+            filepath = os.path.relpath(filepath, source_root)
+        key = filepath.replace(os.sep, '/').encode('utf-8', 'surrogateescape')
+        digest = hashlib.md5(key).digest()
+        return int.from_bytes(digest[:8], 'big') % shard_count
+    
+    @staticmethod
+    def shard_files(source_files, shard_count, shard_index, source_root=None):
+        """Return the subset of source_files that belongs to one shard."""
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+        
+        return [
+            f for f in source_files
+            if FileProcessor.shard_for_path(f, shard_count, source_root) == shard_index
+        ]
+    
+    @staticmethod
+    def merge_results(results):
+        """
+        Merge (stats, errors) pairs from several shards into one report.
+        
+        Returns stats in the same shape as organize_files.
+        """
+        stats = defaultdict(lambda: {'count': 0, 'size': 0})
+        errors = []
+        
+        for shard_stats, shard_errors in results:
+            for year, year_stats in shard_stats.items():
+                stats[year]['count'] += year_stats['count']
+                stats[year]['size'] += year_stats['size']
+            errors.extend(shard_errors)
+            
+        return stats, errors
+    
+    def organize_files_sharded(self, source_files, dest_folder, sort_level,
+                               use_month_names=False, month_language='english',
+                               dry_run=False, shard_count=None, source_root=None,
+                               sidecar_index=None, duplicates=None, duplicate_action='skip',
+                               selected_extensions=None):
+        """
+        Organize files using one worker process per shard.
+        
+        Takes the same arguments as organize_files, plus:
+            shard_count: Number of shards/processes (defaults to CPU count)
+            source_root: Root the shard hash is computed relative to
+        
+        progress_callback(index, label) is called a few times per second
+        with the number of files started so far across all shards (minus
+        one, like organize_files) and a label naming the running shards.
+        stop_processing() is passed on to the workers, which stop before
+        their next file. A duplicate whose kept copy lands in another shard
+        is copied instead of linked.
+        """
+        shard_count = shard_count or os.cpu_count() or 1
+        if sidecar_index is None:
+            sidecar_index = self.sidecar_index
+        
+        self.stop_requested = False
+        self.processed_files = 0
+        self.total_files = len(source_files)
+        self.start_time = time.time()
+        
+        shards = [[] for _ in range(shard_count)]
+        for source_file in source_files:
+            shards[self.shard_for_path(source_file, shard_count, source_root)].append(source_file)
+        
+        context = multiprocessing.get_context()
+        cancel_event = context.Event()
+        file_counter = context.Value('q', 0)
+        
+        results = []
+        with ProcessPoolExecutor(max_workers=shard_count, mp_context=context,
+                                 initializer=_init_shard_worker,
+                                 initargs=(cancel_event, file_counter)) as executor:
+            futures = {
+                executor.submit(_organize_shard, shard, dest_folder, sort_level,
+                                use_month_names, month_language, dry_run,
+                                sidecar_index, duplicates, duplicate_action,
+                                selected_extensions): index
+                for index, shard in enumerate(shards) if shard
+            }
+            pending = set(futures)
+            
+            while pending:
+                finished, pending = wait(pending, timeout=config.SHARD_POLL_INTERVAL,
+                                         return_when=FIRST_COMPLETED)
+                
+                if self.stop_requested:
+                    cancel_event.set()
+                    
+                for future in finished:
+                    index = futures[future]
+                    try:
+                        shard_stats, shard_errors = future.result()
+                    except Exception as e:
+                        shard_stats, shard_errors = {}, [f"Error processing shard {index}: {str(e)}"]
+                        
+                    results.append((shard_stats, shard_errors))
+                    self.processed_files += sum(s['count'] for s in shard_stats.values())
+                    
+                    for error_msg in shard_errors:
+                        if self.error_callback:
+                            self.error_callback(error_msg)
+                            
+                started = file_counter.value
+                if self.progress_callback and started:
+                    self.progress_callback(
+                        started - 1, f"{len(pending)} of {len(futures)} shards running"
+                    )
+                    
+        return self.merge_results(results)
+    
     def organize_files(self, source_files, dest_folder, sort_level, 
-                      use_month_names=False, month_language='english', dry_run=False):
+                      use_month_names=False, month_language='english', dry_run=False,
+                      sidecar_index=None, duplicates=None, duplicate_action='skip',
+                      selected_extensions=None):
         """
         Organize files into date-based folder structure.
         
@@ -49,20 +307,56 @@ class FileProcessor:
             use_month_names: Whether to use month names instead of numbers
             month_language: 'english' or 'spanish'
             dry_run: If True, only simulate without copying
+            sidecar_index: Sidecars from scan_files (defaults to this
+                processor's last scan)
+            duplicates: {duplicate path: kept path}, e.g. from
+                DuplicateFinder.duplicate_map()
+            duplicate_action: 'skip' leaves duplicates out; 'link' hard-links
+                them to the kept copy's destination instead of copying
+            selected_extensions: Member types taken from whole archives
+                (defaults to every supported photo and video type)
+        
+        Archive members ("<archive>!/<member>" paths from scan_files) and
+        whole archives are streamed straight from the archive: members of a
+        ZIP are processed in parallel, a TAR in one sequential pass that also
+        picks up its sidecars. A whole archive contributes the members
+        matching selected_extensions.
         """
         from metadata_extractor import MetadataExtractor
-        import config
         
         self.stop_requested = False
         self.processed_files = 0
+        self.skipped_duplicates = 0
         self.total_files = len(source_files)
         self.start_time = time.time()
+        duplicates = duplicates or {}
+        self._member_extensions = set(selected_extensions) if selected_extensions else None
+        if sidecar_index is not None:
+            self.sidecar_index = sidecar_index
         
         stats = defaultdict(lambda: {'count': 0, 'size': 0})
         errors = []
         
-        for i, source_file in enumerate(source_files):
-            if self.stop_requested:
+        plain_files = []
+        archive_members = {}
+        for source_file in source_files:
+            archive_path, member_name = ArchiveReader.split_member_path(source_file)
+            if archive_path:
+                if archive_members.get(archive_path, []) is not None:
+                    archive_members.setdefault(archive_path, []).append(member_name)
+            elif ArchiveReader.is_archive(source_file):
+                # None: every member matching selected_extensions
+                archive_members[source_file] = None
+            else:
+                plain_files.append(source_file)
+        
+        # Kept copies go first so duplicates can be linked to their destination
+        plain_files.sort(key=lambda f: f in duplicates)
+        keepers = set(duplicates.values()) if duplicate_action == 'link' else set()
+        copied = {}
+        
+        for i, source_file in enumerate(plain_files):
+            if self._should_stop():
                 break
                 
             try:
@@ -70,8 +364,15 @@ class FileProcessor:
                 if self.progress_callback:
                     self.progress_callback(i, source_file)
                 
+                keeper = duplicates.get(source_file)
+                if keeper and duplicate_action == 'skip':
+                    self.skipped_duplicates += 1
+                    continue
+                
                 # Get date from file
-                file_date = MetadataExtractor.get_date_from_file(source_file)
+                file_date = MetadataExtractor.get_date_from_file(
+                    source_file, sidecar_index=self.sidecar_index
+                )
                 
                 if not file_date:
                     errors.append(f"No date found for {source_file}")
@@ -83,15 +384,20 @@ class FileProcessor:
                     sort_level, use_month_names, month_language
                 )
                 
+                # Copy file (or simulate in dry-run mode)
+                if not dry_run:
+                    if keeper in copied:
+                        self._link_file_safely(source_file, copied[keeper], dest_path)
+                    else:
+                        new_dest_path = self._copy_file_safely(source_file, dest_path)
+                        if source_file in keepers:
+                            copied[source_file] = new_dest_path
+                
                 # Update statistics
                 year = file_date.year
                 stats[year]['count'] += 1
                 stats[year]['size'] += os.path.getsize(source_file)
                 
-                # Copy file (or simulate in dry-run mode)
-                if not dry_run:
-                    self._copy_file_safely(source_file, dest_path)
-                
                 self.processed_files += 1
                 
             except Exception as e:
@@ -100,13 +406,177 @@ class FileProcessor:
                 if self.error_callback:
                     self.error_callback(error_msg)
         
+        destination = (dest_folder, sort_level, use_month_names, month_language)
+        self._next_index = len(plain_files)
+        self._undated_members = []
+        
+        for archive_path, member_names in archive_members.items():
+            if self._should_stop():
+                break
+                
+            try:
+                if ArchiveReader.is_zip(archive_path):
+                    self._organize_zip(archive_path, member_names, destination,
+                                       dry_run, stats, errors)
+                else:
+                    self._organize_tar(archive_path, member_names, destination,
+                                       dry_run, stats, errors)
+            except Exception as e:
+                error_msg = f"Error reading archive {archive_path}: {str(e)}"
+                errors.append(error_msg)
+                if self.error_callback:
+                    self.error_callback(error_msg)
+        
+        if not self._should_stop():
+            self._apply_late_sidecars(destination, stats, errors)
+        
         return stats, errors
     
+    def _wants_member(self, name):
+        """Return True for whole-archive members of a selected (or supported) type."""
+        ext = os.path.splitext(name)[1].lower()
+        if self._member_extensions is not None:
+            return ext in self._member_extensions
+        return ext in config.SUPPORTED_EXTENSIONS['images'] or ext in config.SUPPORTED_EXTENSIONS['videos']
+    
+    def _organize_zip(self, archive_path, member_names, destination, dry_run, stats, errors):
+        """Organize ZIP members in parallel, using the archive's random access."""
+        with zipfile.ZipFile(archive_path) as zf:
+            if member_names is None:
+                member_names = [
+                    info.filename for info in zf.infolist()
+                    if not info.is_dir() and self._wants_member(info.filename)
+                ]
+                
+            def process(member):
+                name, size, mtime = member
+                if self._should_stop():
+                    return
+                self._organize_member(archive_path, name, size, mtime,
+                                      lambda: zf.open(name),
+                                      destination, dry_run, stats, errors)
+                    
+            with ThreadPoolExecutor(max_workers=config.ARCHIVE_WORKERS) as executor:
+                list(executor.map(process, ArchiveReader.iter_zip_members(zf, member_names)))
+    
+    def _organize_tar(self, archive_path, member_names, destination, dry_run, stats, errors):
+        """
+        Organize TAR members in a single sequential pass over the archive.
+        
+        Sidecars are indexed as they stream past. Members whose sidecar only
+        shows up later in the archive are fixed by _apply_late_sidecars.
+        """
+        wanted = set(member_names) if member_names is not None else None
+        
+        for name, size, mtime, stream in ArchiveReader.iter_tar_members(archive_path):
+            if self._should_stop():
+                break
+                
+            if SidecarIndex.is_sidecar(name):
+                date = SidecarIndex.parse_date(name, stream.read())
+                if date:
+                    self.sidecar_index.add(ArchiveReader.member_path(archive_path, name), date)
+                continue
+                
+            if (name in wanted) if wanted is not None else self._wants_member(name):
+                self._organize_member(archive_path, name, size, mtime, lambda: stream,
+                                      destination, dry_run, stats, errors)
+    
+    def _organize_member(self, archive_path, member_name, size, mtime, open_stream,
+                         destination, dry_run, stats, errors):
+        """Date and copy one archive member, reading its data only once."""
+        from metadata_extractor import MetadataExtractor
+        
+        source_file = ArchiveReader.member_path(archive_path, member_name)
+        
+        try:
+            with self._lock:
+                index = self._next_index
+                self._next_index += 1
+            if self.progress_callback:
+                self.progress_callback(index, source_file)
+            
+            with open_stream() as stream:
+                # Only the leading bytes are needed for the date; they are
+                # written out first when the rest of the member is streamed
+                header = stream.read(config.ARCHIVE_HEADER_BYTES)
+                file_date = self.sidecar_index.get_date(source_file) if self.sidecar_index else None
+                from_sidecar = file_date is not None
+                if not from_sidecar:
+                    file_date = MetadataExtractor.get_date_from_header(
+                        header, member_name, fallback_date=mtime
+                    )
+                
+                if not file_date:
+                    errors.append(f"No date found for {source_file}")
+                    return
+                
+                dest_folder, sort_level, use_month_names, month_language = destination
+                dest_path = self._build_destination_path(
+                    source_file, dest_folder, file_date,
+                    sort_level, use_month_names, month_language
+                )
+                
+                new_dest_path = None
+                if not dry_run:
+                    new_dest_path = self._copy_stream_safely(header, stream, dest_path, mtime)
+            
+            with self._lock:
+                year = file_date.year
+                stats[year]['count'] += 1
+                stats[year]['size'] += size
+                self.processed_files += 1
+                if not from_sidecar:
+                    self._undated_members.append((source_file, new_dest_path, file_date, size))
+                
+        except InterruptedError:
+            # Stopped in the middle of a copy
+            pass
+        except Exception as e:
+            error_msg = f"Error processing {source_file}: {str(e)}"
+            errors.append(error_msg)
+            if self.error_callback:
+                self.error_callback(error_msg)
+    
+    def _apply_late_sidecars(self, destination, stats, errors):
+        """
+        Re-date archive members whose sidecar was only indexed after they
+        were copied (later in a TAR stream, or in another archive), moving
+        the copy to the folder of the sidecar date.
+        """
+        dest_folder, sort_level, use_month_names, month_language = destination
+        
+        for source_file, copied_path, old_date, size in self._undated_members:
+            new_date = self.sidecar_index.get_date(source_file) if self.sidecar_index else None
+            if not new_date or new_date == old_date:
+                continue
+                
+            try:
+                if copied_path:
+                    dest_path = self._build_destination_path(
+                        copied_path, dest_folder, new_date,
+                        sort_level, use_month_names, month_language
+                    )
+                    if os.path.dirname(dest_path) != os.path.dirname(copied_path):
+                        self._move_file_safely(copied_path, dest_path)
+                        
+                stats[old_date.year]['count'] -= 1
+                stats[old_date.year]['size'] -= size
+                if not stats[old_date.year]['count']:
+                    del stats[old_date.year]
+                stats[new_date.year]['count'] += 1
+                stats[new_date.year]['size'] += size
+            except Exception as e:
+                error_msg = f"Error processing {source_file}: {str(e)}"
+                errors.append(error_msg)
+                if self.error_callback:
+                    self.error_callback(error_msg)
+                    
+        self._undated_members = []
+    
     def _build_destination_path(self, source_file, dest_folder, file_date,
                                sort_level, use_month_names, month_language):
         """Build the destination path based on date and sorting level."""
-        import config
-        
         year_folder = str(file_date.year)
         
         if sort_level >= 1:
@@ -141,23 +611,113 @@ class FileProcessor:
         
         return dest_path
     
-    def _copy_file_safely(self, source_path, dest_path):
-        """Copy file, handling duplicate names."""
-        if not os.path.exists(dest_path):
-            shutil.copy2(source_path, dest_path)
-            return dest_path
+    def _claim_destination(self, dest_path, create=None):
+        """
+        Reserve a free destination name, adding a numeric suffix on clashes.
         
-        # Handle duplicate filenames
+        The name is claimed with an exclusive create, so shards running in
+        other processes or on other machines that share the destination
+        never pick the same name. create(path) may replace the default empty
+        file; it must raise FileExistsError if the name is taken.
+        """
         base, ext = os.path.splitext(dest_path)
-        counter = 1
+        candidate = dest_path
+        counter = 0
         
-        while os.path.exists(f"{base}_{counter}{ext}"):
-            counter += 1
+        while True:
+            try:
+                if create:
+                    create(candidate)
+                else:
+                    os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except FileExistsError:
+                counter += 1
+                candidate = f"{base}{config.DUPLICATE_SUFFIX_TEMPLATE.format(counter)}{ext}"
+                continue
+            return candidate
+    
+    def _copy_file_safely(self, source_path, dest_path):
+        """
+        Copy file, handling duplicate names.
+        
+        The data is written to a hidden temporary file next to the
+        destination and only then moved to its final name, so a copy that is
+        killed never leaves a truncated file under a normal name. A stop
+        takes effect between files.
+        """
+        temp_path = self._create_temp_file(dest_path)
         
-        new_dest_path = f"{base}_{counter}{ext}"
-        shutil.copy2(source_path, new_dest_path)
+        try:
+            shutil.copy2(source_path, temp_path)
+            return self._move_file_safely(temp_path, dest_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def _link_file_safely(self, source_path, link_target, dest_path):
+        """
+        Hard-link dest_path to an already organized copy, handling duplicate
+        names. Falls back to copying source_path where links aren't possible.
+        """
+        try:
+            return self._claim_destination(dest_path, lambda path: os.link(link_target, path))
+        except OSError:
+            return self._copy_file_safely(source_path, dest_path)
+    
+    def _move_file_safely(self, source_path, dest_path):
+        """Move an organized file to a new name, handling duplicate names."""
+        try:
+            new_dest_path = self._claim_destination(dest_path, lambda path: os.link(source_path, path))
+        except OSError:
+            # No hard links on this file system: claim the name, then replace it
+            new_dest_path = self._claim_destination(dest_path)
+            os.replace(source_path, new_dest_path)
+            return new_dest_path
+            
+        os.remove(source_path)
         return new_dest_path
     
+    def _copy_stream_safely(self, header, stream, dest_path, mtime):
+        """
+        Write an already-read header plus the rest of a stream to a new
+        file, handling duplicate names and keeping the original timestamp.
+        """
+        temp_path = self._create_temp_file(dest_path)
+        
+        try:
+            with open(temp_path, 'wb') as dest:
+                dest.write(header)
+                self._copy_data(stream, dest)
+            timestamp = mtime.timestamp()
+            os.utime(temp_path, (timestamp, timestamp))
+            return self._move_file_safely(temp_path, dest_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    @staticmethod
+    def _create_temp_file(dest_path):
+        """Create a hidden, uniquely named temporary file beside dest_path."""
+        dest_dir, filename = os.path.split(dest_path)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{filename}.", suffix=config.PARTIAL_SUFFIX,
+                                         dir=dest_dir)
+        os.close(fd)
+        return temp_path
+    
+    def _copy_data(self, source, dest):
+        """Copy a stream in chunks, raising InterruptedError once a stop is requested."""
+        while True:
+            if self._should_stop():
+                raise InterruptedError("Processing stopped")
+            chunk = source.read(config.COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            dest.write(chunk)
+    
     def stop_processing(self):
         """Request to stop processing."""
-        self.stop_requested = True
\ No newline at end of file
+        self.stop_requested = True
+    
+    def _should_stop(self):
+        """Return True once stop_processing was called or cancel_event is set."""
+        return self.stop_requested or (self.cancel_event is not None and self.cancel_event.is_set())
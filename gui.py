@@ -9,6 +9,8 @@ from collections import defaultdict
 import threading
 import time
 
+import config
+
 class MediaSorterGUI:
     """Main GUI for Media Sorter application."""
     
@@ -28,6 +30,7 @@ class MediaSorterGUI:
         # File tracking
         self.selected_extensions = set()
         self.all_files = []
+        self.sidecar_index = None
         self.file_processor = None
         
         # Create GUI
@@ -213,14 +216,14 @@ class MediaSorterGUI:
         
         # Scan in background thread
         def scan_thread():
-            processor = FileProcessor()
-            import config
+            processor = FileProcessor(error_callback=self._log_error)
             
             # Get all supported extensions
             all_extensions = set(config.SUPPORTED_EXTENSIONS['images'] + 
                                config.SUPPORTED_EXTENSIONS['videos'])
             
             self.all_files, extension_counts = processor.scan_files(source, all_extensions)
+            self.sidecar_index = processor.sidecar_index
             
             # Update UI in main thread
             self.root.after(0, self._update_filetype_list, extension_counts)
@@ -298,10 +301,12 @@ class MediaSorterGUI:
             messagebox.showwarning("Warning", "Please select a destination folder")
             return
             
+        from file_processor import FileProcessor
+        
         # Filter files by selected extensions
         files_to_process = [
             f for f in self.all_files 
-            if os.path.splitext(f)[1].lower() in self.selected_extensions
+            if FileProcessor.file_extension(f) in self.selected_extensions
         ]
         
         if not files_to_process:
@@ -317,34 +322,49 @@ class MediaSorterGUI:
         self.progress_bar['value'] = 0
         self.progress_label.config(text="Starting...")
         
-        # Start processing in background thread
-        def process_thread():
-            from file_processor import FileProcessor
-            
-            self.file_processor = FileProcessor(
-                progress_callback=self._update_progress,
-                error_callback=self._log_error
-            )
-            
-            stats, errors = self.file_processor.organize_files(
-                source_files=files_to_process,
-                dest_folder=self.dest_folder.get(),
-                sort_level=self.sort_level.get(),
-                use_month_names=self.use_month_names.get(),
-                month_language=self.month_language.get(),
-                dry_run=self.dry_run.get()
-            )
-            
-            # Update UI in main thread
-            self.root.after(0, self._processing_complete, stats, errors)
-            
-        threading.Thread(target=process_thread, daemon=True).start()
+        # Start processing in a child process so the UI keeps its own GIL
+        from engine_process import EngineProcess
+        
+        self.file_processor = EngineProcess()
+        self.file_processor.start(
+            files_to_process,
+            dest_folder=self.dest_folder.get(),
+            sort_level=self.sort_level.get(),
+            use_month_names=self.use_month_names.get(),
+            month_language=self.month_language.get(),
+            dry_run=self.dry_run.get(),
+            sidecar_index=self.sidecar_index,
+            selected_extensions=self.selected_extensions
+        )
+        self.root.after(config.ENGINE_POLL_INTERVAL_MS, self._poll_engine)
+        
+    def _poll_engine(self):
+        """Apply batched messages from the engine process until it finishes."""
+        for message in self.file_processor.poll():
+            if message[0] == 'progress':
+                _, progress, errors = message
+                for error in errors:
+                    self._log_error(error)
+                if progress:
+                    self._update_progress(*progress)
+            elif message[0] == 'done':
+                self._processing_complete(message[1], message[2])
+                return
+            elif message[0] == 'stopped':
+                self._processing_stopped(message[1])
+                return
+            else:
+                self._processing_failed(message[1])
+                return
+                
+        self.root.after(config.ENGINE_POLL_INTERVAL_MS, self._poll_engine)
         
     def _update_progress(self, current, current_file):
         """Update progress display."""
         def update():
-            total = self.file_processor.total_files
             processed = current + 1
+            # A whole archive counts as one source but reports each member
+            total = max(self.file_processor.total_files, processed)
             
             # Update progress bar
             progress_percent = (processed / total) * 100
@@ -417,6 +437,23 @@ class MediaSorterGUI:
             
         self._log_message(f"Processing complete. {total_files} files processed.")
         
+    def _processing_failed(self, message):
+        """Handle the engine process failing or crashing."""
+        self.scan_button.config(state='normal')
+        self.start_button.config(state='normal')
+        self.stop_button.config(state='disabled')
+        
+        self._log_error(message)
+        messagebox.showerror("Processing Failed", message.strip().splitlines()[-1])
+        
+    def _processing_stopped(self, message):
+        """Handle the engine process being terminated after a stop request."""
+        self.scan_button.config(state='normal')
+        self.start_button.config(state='normal')
+        self.stop_button.config(state='disabled')
+        
+        self._log_message(message)
+        
     def _stop_processing(self):
         """Stop the current processing."""
         if self.file_processor:
@@ -4,6 +4,7 @@ Main entry point for Media Sorter application.
 
 import tkinter as tk
 from gui import MediaSorterGUI
+import multiprocessing
 import sys
 
 def main():
@@ -33,4 +34,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Needed for the engine/worker processes in the frozen EXE
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -2,21 +2,31 @@
 EXIF and metadata extraction from media files.
 """
 
+import io
 import os
 from datetime import datetime
 from PIL import Image, ExifTags
 from PIL.ExifTags import TAGS
 import mimetypes
 
+import config
+from exif_reader import ExifReader, ExifFormatError
+
 class MetadataExtractor:
     """Extracts date information from media files."""
     
     @staticmethod
-    def get_date_from_file(filepath, fallback_to_filesystem=True):
+    def get_date_from_file(filepath, fallback_to_filesystem=True, sidecar_index=None):
         """
         Try to get date from metadata, fall back to file system dates.
+        A sidecar found in sidecar_index wins without opening the file.
         Returns datetime object or None.
         """
+        if sidecar_index:
+            date_from_sidecar = sidecar_index.get_date(filepath)
+            if date_from_sidecar:
+                return date_from_sidecar
+                
         # First try EXIF/metadata
         date_from_meta = MetadataExtractor._get_date_from_metadata(filepath)
         if date_from_meta:
@@ -29,13 +39,25 @@ class MetadataExtractor:
         return None
     
     @staticmethod
-    def _get_date_from_metadata(filepath):
+    def get_date_from_header(header, name, fallback_date=None):
+        """
+        Get date from the leading bytes of a file that isn't on disk, such as
+        an archive member. name is only used to guess the file type.
+        Falls back to fallback_date (e.g. the timestamp stored in the archive).
+        """
+        date_from_meta = MetadataExtractor._get_date_from_metadata(name, io.BytesIO(header))
+        return date_from_meta or fallback_date
+    
+    @staticmethod
+    def _get_date_from_metadata(filepath, fileobj=None):
         """Extract date from image EXIF or video metadata."""
         try:
             mime_type, _ = mimetypes.guess_type(filepath)
+            # Older Pythons don't know every image type (e.g. .heic)
+            ext = os.path.splitext(filepath)[1].lower()
             
-            if mime_type and mime_type.startswith('image/'):
-                return MetadataExtractor._get_exif_date(filepath)
+            if (mime_type and mime_type.startswith('image/')) or ext in config.SUPPORTED_EXTENSIONS['images']:
+                return MetadataExtractor._get_exif_date(fileobj or filepath)
             elif mime_type and mime_type.startswith('video/'):
                 # For videos, we could use a library like hachoir or ffmpeg
                 # For simplicity, we'll use file system dates for now
@@ -49,7 +71,21 @@ class MetadataExtractor:
     
     @staticmethod
     def _get_exif_date(filepath):
-        """Extract date from EXIF data of images."""
+        """
+        Extract date from EXIF data of images (path or file object).
+        
+        JPEG, PNG, WebP and HEIC are read by walking the container with
+        ExifReader; Pillow is only used for other formats or when the
+        container can't be walked.
+        """
+        try:
+            return ExifReader.read_date(filepath)
+        except ExifFormatError:
+            if not isinstance(filepath, str):
+                filepath.seek(0)
+        except OSError:
+            return None
+            
         try:
             with Image.open(filepath) as img:
                 exif_data = img._getexif()
@@ -62,12 +98,9 @@ class MetadataExtractor:
                         for tag_id, tag_value in TAGS.items():
                             if tag_value == tag_name and tag_id in exif_data:
                                 date_str = exif_data[tag_id]
-                                if date_str:
-                                    # Parse EXIF date format: "YYYY:MM:DD HH:MM:SS"
-                                    try:
-                                        return datetime.strptime(date_str, '%Y:%m:%d %H:%M:%S')
-                                    except ValueError:
-                                        continue
+                                date = ExifReader.parse_date_string(date_str)
+                                if date:
+                                    return date
         except Exception:
             pass
             
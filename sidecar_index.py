@@ -0,0 +1,153 @@
+"""
+Index of metadata sidecar files (Google Takeout .json, Lightroom/darktable .xmp).
+
+The index is filled while scan_files walks the source folder, so finding
+the sidecar of a media file is a handful of dictionary lookups and never
+needs another directory listing. Sidecars inside archives are keyed by their
+folder within the archive, because Takeout splits one export over several
+archives (takeout-001.zip, takeout-002.zip, ...) and a photo and its sidecar
+can end up in different parts.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+import config
+from archive_reader import ArchiveReader
+
+# Takeout names its sidecars "<media name>.json" but cuts the part before
+# ".json" to this many characters
+TAKEOUT_MAX_STEM = 46
+TAKEOUT_SUFFIXES = ('', '.supplemental-metadata')
+TAKEOUT_DUPLICATE = re.compile(r'^(.*)\((\d+)\)(\.[^.]*)?$')
+TAKEOUT_EDITED = '-edited'
+
+XMP_DATE = re.compile(
+    r'(?:exif:DateTimeOriginal|xmp:CreateDate|photoshop:DateCreated)'
+    r'\s*(?:=\s*["\']|>\s*)(\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}(?::\d{2})?)?)'
+)
+
+
+class SidecarIndex:
+    """Maps media files to their sidecar metadata in O(1)."""
+    
+    def __init__(self):
+        # (directory, key) -> sidecar path, or the parsed date for sidecars
+        # that were read while scanning (e.g. inside archives)
+        self._json = {}
+        self._xmp = {}
+    
+    def __len__(self):
+        return len(self._json) + len(self._xmp)
+    
+    @staticmethod
+    def is_sidecar(filename):
+        """Return True for file names that may hold sidecar metadata."""
+        return os.path.splitext(filename)[1].lower() in config.SIDECAR_EXTENSIONS
+    
+    def add(self, sidecar_path, date=None):
+        """
+        Register a sidecar file. Pass date when the sidecar has already been
+        parsed; otherwise it is read on first lookup.
+        """
+        directory, filename = self._split(sidecar_path)
+        stem, ext = os.path.splitext(filename)
+        entry = date if date is not None else sidecar_path
+        
+        if ext.lower() == '.json':
+            self._json[(directory, stem.lower())] = entry
+        else:
+            self._xmp[(directory, stem.lower())] = entry
+    
+    def get_date(self, filepath):
+        """Return the date recorded in the file's sidecar, or None."""
+        entry = self._find(filepath)
+        if entry is None:
+            return None
+        if isinstance(entry, datetime):
+            return entry
+        
+        try:
+            with open(entry, 'rb') as f:
+                return self.parse_date(entry, f.read())
+        except OSError:
+            return None
+    
+    def _find(self, filepath):
+        """Look up a file's sidecar entry, trying Takeout's naming quirks."""
+        directory, filename = self._split(filepath)
+        name = filename.lower()
+        
+        for key in self._takeout_keys(name):
+            entry = self._json.get((directory, key))
+            if entry is not None:
+                return entry
+        
+        for key in (name, os.path.splitext(name)[0]):
+            entry = self._xmp.get((directory, key))
+            if entry is not None:
+                return entry
+        
+        return None
+    
+    @staticmethod
+    def _split(path):
+        """
+        Split a path into (directory key, file name). Archive members use
+        their folder inside the archive, marked with the member separator.
+        """
+        archive_path, member_name = ArchiveReader.split_member_path(path)
+        if archive_path is not None:
+            directory, filename = os.path.split(member_name)
+            return config.ARCHIVE_MEMBER_SEPARATOR + directory, filename
+        return os.path.split(path)
+    
+    @staticmethod
+    def _takeout_keys(name):
+        """Yield the possible sidecar stems Takeout may have used for a media name."""
+        # "photo(1).jpg" is described by "photo.jpg(1).json"; try that first,
+        # as a long name cut to 46 characters can also match the original's
+        match = TAKEOUT_DUPLICATE.match(name)
+        if match:
+            original = match.group(1) + (match.group(3) or '')
+            for suffix in TAKEOUT_SUFFIXES:
+                yield (original + suffix)[:TAKEOUT_MAX_STEM] + f"({match.group(2)})"
+        
+        names = [name]
+        base, ext = os.path.splitext(name)
+        if base.endswith(TAKEOUT_EDITED):
+            # Edited copies share the sidecar of the original
+            names.append(base[:-len(TAKEOUT_EDITED)] + ext)
+        
+        for candidate in names:
+            for suffix in TAKEOUT_SUFFIXES:
+                yield (candidate + suffix)[:TAKEOUT_MAX_STEM]
+        
+        # Older exports sometimes drop the media extension
+        yield os.path.splitext(name)[0]
+    
+    @staticmethod
+    def parse_date(sidecar_name, data):
+        """Parse the capture date out of the raw bytes of a sidecar file."""
+        try:
+            if sidecar_name.lower().endswith('.json'):
+                meta = json.loads(data)
+                for field in ('photoTakenTime', 'creationTime'):
+                    timestamp = (meta.get(field) or {}).get('timestamp')
+                    if timestamp:
+                        return datetime.fromtimestamp(int(timestamp))
+            else:
+                match = XMP_DATE.search(data.decode('utf-8', 'replace'))
+                if match:
+                    value = match.group(1)
+                    if 'T' not in value:
+                        return datetime.strptime(value, '%Y-%m-%d')
+                    if value.count(':') == 1:
+                        value += ':00'
+                    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S')
+        except (ValueError, TypeError, AttributeError, OverflowError):
+            pass
+        
+        return None